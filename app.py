@@ -3,17 +3,163 @@ import json
 import uuid
 import time
 import re
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
 from datetime import datetime
+import numpy as np
+try:
+    from numba import njit
+except ImportError:  # optional: large meetings fall back to the NumPy path
+    njit = None
+import orjson
 from flask import Flask, request, jsonify, render_template, send_file
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from fpdf import FPDF
 import io
 
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping via str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=_ORJSON_OPTIONS),
+                                        mimetype='application/json')
+
 app = Flask(__name__, static_folder='.', static_url_path='')
+app.json = OrjsonProvider(app)
 CORS(app)
 
-# In-memory storage for serverless compatibility
-meetings = {}
+# In-memory storage for serverless compatibility, evicting least recently used meetings
+MAX_MEETINGS = int(os.environ.get('MAX_MEETINGS', 100))
+meetings = OrderedDict()
+
+# Prebuilds the final PDF when a meeting stops so /stop doesn't wait on the render
+_pdf_executor = ThreadPoolExecutor(max_workers=2)
+
+# Detection vocabularies, built once at import instead of on every utterance
+# Question starters must be the whole first word, as with the old split()[0] check
+_STARTER_RE = re.compile(r'(?:%s)(?=\s|$)' % '|'.join((
+    'what', 'where', 'when', 'why', 'who', 'how', 'is', 'are', 'can',
+    'could', 'would', 'should', 'will', 'do', 'does', 'did', 'have',
+    'has', 'am', 'was', 'were'
+)))
+
+# Question phrasings fused into one alternation so each utterance is scanned once
+_QUESTION_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'\b(?:what|where|when|why|how|who)\s+(?:is|are|was|were|do|does|did|can|could|would)',
+    r'\b(?:can you|could you|would you|will you)\s+\w+',
+    r'\b(?:let me know|tell me|i\'m wondering|i was wondering)\b',
+    r'\b(?:any idea|do you know|have you heard)\b'
+)))
+
+_DECISION_INDICATORS = (
+    'decided', 'decision', 'agreed', 'conclusion', 'finalized',
+    'resolved', 'approved', 'confirmed', 'consensus', 'settled on',
+    'moving forward with', 'we will', 'let\'s go with'
+)
+_DECISION_RE = re.compile('|'.join(re.escape(ind) for ind in _DECISION_INDICATORS))
+
+_DEADLINE_WORDS = (
+    'by tomorrow', 'by friday', 'by monday', 'by next',
+    'by the end of', 'asap', 'soon', 'this week', 'next week'
+)
+
+# Assignment phrasings and deadline words share a single alternation
+_ACTION_RE = re.compile('|'.join([f'(?:{p})' for p in (
+    r'(?:i will|i\'ll|i am going to|i\'m going to)\s+.+',
+    r'(?:let me|i can|i should)\s+.+',
+    r'(?:will you|can you|could you)\s+.+',
+    r'(?:action item|todo|task|follow up|follow-up)'
+)] + [re.escape(d) for d in _DEADLINE_WORDS]))
+
+_ANSWER_START_RE = re.compile('|'.join(re.escape(a) for a in (
+    'yes', 'no', 'absolutely', 'definitely', 'correct',
+    'right', 'exactly', 'sure', 'well', 'i think', 'in my opinion'
+)))
+
+# Speaker matching switches to NumPy once a meeting has this many speakers
+_VECTORIZE_MIN_SPEAKERS = 8
+_FEATURE_CHUNK = 16
+_EMA_ALPHA = np.float32(0.3)
+
+# Tab, system and screen-share capture all carry the remote side of the call
+REMOTE_SOURCES = frozenset(['tab_audio', 'system_audio', 'screen_share'])
+
+def source_pool(audio_source):
+    """Speakers are only matched against others heard through the same pool"""
+    return 'remote' if audio_source in REMOTE_SOURCES else audio_source
+
+def _score_speakers(pitches, paces, energies, candidates, pitch, pace, energy,
+                    threshold):
+    """Feature-array index of the closest candidate under threshold, or -1"""
+    best = -1
+    best_score = threshold
+    for k in range(len(candidates)):
+        i = candidates[k]
+        pitch_diff = abs(pitches[i] - pitch)
+        pace_diff = abs(paces[i] - pace) / 10
+        energy_diff = abs(energies[i] - energy) / 50
+        
+        score = (pitch_diff * 0.5) + (pace_diff * 0.3) + (energy_diff * 0.2)
+        if score < best_score:
+            best_score = score
+            best = i
+    return best
+
+_score_speakers_jit = njit(cache=True)(_score_speakers) if njit is not None else None
+
+@dataclass(slots=True)
+class Utterance:
+    """A single transcript entry"""
+    timestamp: float
+    speaker_id: str
+    speaker_name: str
+    text: str
+    audio_source: str
+    is_remote: bool
+    voice_features: dict
+    type: str = 'statement'
+    question_id: int | None = None
+    answers_question: int | None = None
+    is_decision: bool = False
+    is_action_item: bool = False
+    assignee: str | None = None
+    
+    def to_dict(self):
+        """Client payload; optional fields are only present when set"""
+        data = {
+            'timestamp': format_timestamp(self.timestamp),
+            'speaker_id': self.speaker_id,
+            'speaker_name': self.speaker_name,
+            'text': self.text,
+            'type': self.type,
+            'audio_source': self.audio_source,
+            'is_remote': self.is_remote,
+            'voice_features': self.voice_features
+        }
+        if self.question_id is not None:
+            data['question_id'] = self.question_id
+        if self.answers_question is not None:
+            data['answers_question'] = self.answers_question
+        if self.is_decision:
+            data['is_decision'] = True
+        if self.is_action_item:
+            data['is_action_item'] = True
+            data['assignee'] = self.assignee
+        return data
 
 class MeetingStore:
     def __init__(self, meeting_type='physical'):
@@ -21,182 +167,238 @@ class MeetingStore:
         self.participants = {}
         self.speaker_counter = 0
         self.transcript = []
+        self.speaker_counts = {}
+        self.answers_by_q = defaultdict(list)
+        # Transcript indices by minutes section, filled in as utterances arrive
+        self._question_idx = []
+        self._decision_idx = []
+        self._action_idx = []
+        self._statement_idx = []
         self.unanswered_questions = []
         self.start_time = None
         self.end_time = None
         self.meeting_title = f"Meeting - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         self.audio_sources = set()
+        self._pdf_cache = None
+        self._pdf_prebuild = None
+        self._lock = threading.Lock()
+        
+        # Speaker feature averages as parallel float32 arrays, the only copy of
+        # each speaker's voice profile
+        self._speaker_ids = []
+        self._speaker_index = {}
+        self._by_source = {}  # source pool -> feature-array indices of its speakers
+        self._pitch = np.zeros(_FEATURE_CHUNK, dtype=np.float32)
+        self._pace = np.zeros(_FEATURE_CHUNK, dtype=np.float32)
+        self._energy = np.zeros(_FEATURE_CHUNK, dtype=np.float32)
         
     def get_or_create_speaker(self, voice_features, audio_source='default'):
         """Advanced speaker recognition with source isolation"""
-        source_key = f"{audio_source}_{voice_features.get('channel', 'mono')}"
-        
-        best_match = None
-        best_score = float('inf')
-        
-        search_space = list(self.participants.items())
-        
-        for speaker_id, data in search_space:
-            pitch_diff = abs(data.get('avg_pitch', 0) - voice_features.get('avg_pitch', 0))
-            pace_diff = abs(data.get('avg_pace', 0) - voice_features.get('words_per_minute', 0)) / 10
-            energy_diff = abs(data.get('avg_energy', 0) - voice_features.get('energy', 0)) / 50
-            
-            score = (pitch_diff * 0.5) + (pace_diff * 0.3) + (energy_diff * 0.2)
-            
-            threshold = 25 if self.meeting_type == 'hybrid' else 20
-            if score < threshold and score < best_score:
-                best_score = score
-                best_match = speaker_id
+        # Only speakers heard through a compatible source can match; hybrid
+        # meetings mix room and call audio, so every speaker shares one pool
+        pool = 'shared' if self.meeting_type == 'hybrid' else source_pool(audio_source)
+        candidates = self._by_source.setdefault(pool, [])
+        
+        threshold = 25 if self.meeting_type == 'hybrid' else 20
+        
+        if not candidates:
+            best_match = None
+        elif len(candidates) < _VECTORIZE_MIN_SPEAKERS:
+            best_match = self._match_speaker_scalar(candidates, voice_features, threshold)
+        elif _score_speakers_jit is not None:
+            best_match = self._match_speaker_jit(candidates, voice_features, threshold)
+        else:
+            best_match = self._match_speaker_vectorized(candidates, voice_features, threshold)
                 
         if best_match:
-            old_count = len([t for t in self.transcript if t['speaker_id'] == best_match])
-            speaker_data = self.participants[best_match]
-            
-            alpha = 0.3
-            speaker_data['avg_pitch'] = (alpha * voice_features.get('avg_pitch', 100) + 
-                                          (1-alpha) * speaker_data.get('avg_pitch', 100))
-            speaker_data['avg_pace'] = (alpha * voice_features.get('words_per_minute', 120) + 
-                                       (1-alpha) * speaker_data.get('avg_pace', 120))
-            speaker_data['samples_count'] = old_count + 1
+            idx = self._speaker_index[best_match]
+            self._pitch[idx] = (_EMA_ALPHA * np.float32(voice_features.get('avg_pitch', 100)) +
+                                (1 - _EMA_ALPHA) * self._pitch[idx])
+            self._pace[idx] = (_EMA_ALPHA * np.float32(voice_features.get('words_per_minute', 120)) +
+                               (1 - _EMA_ALPHA) * self._pace[idx])
             return best_match
             
         self.speaker_counter += 1
         speaker_id = f"speaker_{uuid.uuid4().hex[:8]}"
         
-        is_remote = audio_source in ['tab_audio', 'system_audio', 'screen_share']
+        is_remote = audio_source in REMOTE_SOURCES
         
         self.participants[speaker_id] = {
             "name": f"Participant {self.speaker_counter}" + (" (Remote)" if is_remote else ""),
-            "avg_pitch": voice_features.get('avg_pitch', 100),
-            "avg_pace": voice_features.get('words_per_minute', 120),
-            "avg_energy": voice_features.get('energy', 5000),
             "voice_id": speaker_id,
             "audio_source": audio_source,
             "is_remote": is_remote,
-            "samples_count": 1,
-            "first_seen": datetime.now().isoformat()
+            "first_seen": time.time()
         }
+        candidates.append(self._add_speaker_features(
+            speaker_id,
+            voice_features.get('avg_pitch', 100),
+            voice_features.get('words_per_minute', 120),
+            voice_features.get('energy', 5000)
+        ))
         return speaker_id
     
-    def is_question(self, text):
+    def _match_speaker_scalar(self, candidates, voice_features, threshold):
+        """Score each candidate in Python; cheapest for a handful of speakers"""
+        best_match = None
+        best_score = float('inf')
+        
+        for idx, avg_pitch, avg_pace, avg_energy in zip(
+                candidates, self._pitch[candidates].tolist(),
+                self._pace[candidates].tolist(), self._energy[candidates].tolist()):
+            pitch_diff = abs(avg_pitch - voice_features.get('avg_pitch', 0))
+            pace_diff = abs(avg_pace - voice_features.get('words_per_minute', 0)) / 10
+            energy_diff = abs(avg_energy - voice_features.get('energy', 0)) / 50
+            
+            score = (pitch_diff * 0.5) + (pace_diff * 0.3) + (energy_diff * 0.2)
+            
+            if score < threshold and score < best_score:
+                best_score = score
+                best_match = self._speaker_ids[idx]
+                
+        return best_match
+    
+    def _match_speaker_vectorized(self, candidates, voice_features, threshold):
+        """Score all candidates at once over the feature arrays"""
+        pitch_diff = np.abs(self._pitch[candidates] - voice_features.get('avg_pitch', 0))
+        pace_diff = np.abs(self._pace[candidates] - voice_features.get('words_per_minute', 0)) / 10
+        energy_diff = np.abs(self._energy[candidates] - voice_features.get('energy', 0)) / 50
+        
+        scores = (pitch_diff * 0.5) + (pace_diff * 0.3) + (energy_diff * 0.2)
+        
+        best = int(np.argmin(scores))
+        if scores[best] < threshold:
+            return self._speaker_ids[candidates[best]]
+        return None
+    
+    def _match_speaker_jit(self, candidates, voice_features, threshold):
+        """Score all candidates in one compiled loop when numba is installed"""
+        best = _score_speakers_jit(
+            self._pitch, self._pace, self._energy, np.asarray(candidates, dtype=np.intp),
+            float(voice_features.get('avg_pitch', 0)),
+            float(voice_features.get('words_per_minute', 0)),
+            float(voice_features.get('energy', 0)),
+            float(threshold))
+        return self._speaker_ids[best] if best >= 0 else None
+    
+    def _add_speaker_features(self, speaker_id, pitch, pace, energy):
+        """Append a new speaker's features to the arrays, growing them in chunks.
+        
+        Returns the speaker's index into the arrays.
+        """
+        idx = len(self._speaker_ids)
+        if idx == len(self._pitch):
+            size = idx + _FEATURE_CHUNK
+            self._pitch = np.resize(self._pitch, size)
+            self._pace = np.resize(self._pace, size)
+            self._energy = np.resize(self._energy, size)
+            
+        self._pitch[idx] = pitch
+        self._pace[idx] = pace
+        self._energy[idx] = energy
+        self._speaker_ids.append(speaker_id)
+        self._speaker_index[speaker_id] = idx
+        return idx
+    
+    def is_question(self, text, text_lower=None):
         """Enhanced question detection"""
         text = text.strip()
-        text_lower = text.lower()
+        text_lower = (text_lower or text.lower()).strip()
         
         if text.endswith('?'):
             return True
             
-        starters = ['what', 'where', 'when', 'why', 'who', 'how', 'is', 'are', 'can', 
-                   'could', 'would', 'should', 'will', 'do', 'does', 'did', 'have', 
-                   'has', 'am', 'was', 'were']
-        words = text_lower.split()
-        if words and words[0] in starters:
+        if _STARTER_RE.match(text_lower):
             return True
             
-        patterns = [
-            r'\b(what|where|when|why|how|who)\s+(is|are|was|were|do|does|did|can|could|would)',
-            r'\b(can you|could you|would you|will you)\s+\w+',
-            r'\b(let me know|tell me|i\'m wondering|i was wondering)\b',
-            r'\b(any idea|do you know|have you heard)\b'
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                return True
-                
-        return False
+        return _QUESTION_RE.search(text_lower) is not None
     
-    def detect_decision(self, text):
+    def detect_decision(self, text, text_lower=None):
         """Auto-detect decisions"""
-        indicators = ['decided', 'decision', 'agreed', 'conclusion', 'finalized', 
-                     'resolved', 'approved', 'confirmed', 'consensus', 'settled on',
-                     'moving forward with', 'we will', 'let\'s go with', 'approved']
-        text_lower = text.lower()
-        return any(ind in text_lower for ind in indicators)
+        text_lower = text_lower or text.lower()
+        return _DECISION_RE.search(text_lower) is not None
     
-    def detect_action_item(self, text, speaker):
+    def detect_action_item(self, text, speaker, text_lower=None):
         """Auto-detect action items"""
-        assign_patterns = [
-            r'(i will|i\'ll|i am going to|i\'m going to)\s+(.+)',
-            r'(let me|i can|i should)\s+(.+)',
-            r'(will you|can you|could you)\s+(.+)',
-            r'(action item|todo|task|follow up|follow-up)'
-        ]
-        
-        text_lower = text.lower()
-        
-        for pattern in assign_patterns:
-            if re.search(pattern, text_lower):
-                return True
-                
-        deadline_words = ['by tomorrow', 'by friday', 'by monday', 'by next', 
-                         'by the end of', 'asap', 'soon', 'this week', 'next week']
-        if any(d in text_lower for d in deadline_words):
-            return True
-            
-        return False
+        text_lower = text_lower or text.lower()
+        return _ACTION_RE.search(text_lower) is not None
     
     def add_utterance(self, text, voice_features, audio_source='default'):
         """Process new speech"""
-        speaker_id = self.get_or_create_speaker(voice_features, audio_source)
-        speaker_data = self.participants[speaker_id]
-        
-        entry = {
-            'timestamp': datetime.now().isoformat(),
-            'speaker_id': speaker_id,
-            'speaker_name': speaker_data['name'],
-            'text': text,
-            'type': 'statement',
-            'audio_source': audio_source,
-            'is_remote': speaker_data['is_remote'],
-            'voice_features': {
-                'pitch': voice_features.get('avg_pitch'),
-                'pace': voice_features.get('words_per_minute'),
-                'energy': voice_features.get('energy')
-            }
-        }
-        
-        if self.is_question(text):
-            entry['type'] = 'question'
-            entry['question_id'] = len(self.transcript)
-            self.unanswered_questions.append({
-                'index': len(self.transcript),
-                'timestamp': datetime.now(),
-                'speaker': speaker_id
-            })
-        else:
-            if self.unanswered_questions:
-                last_q = self.unanswered_questions[-1]
-                time_since_q = len(self.transcript) - last_q['index']
+        # Held for the whole update so a PDF render sees a consistent meeting
+        with self._lock:
+            speaker_id = self.get_or_create_speaker(voice_features, audio_source)
+            speaker_data = self.participants[speaker_id]
+            self.speaker_counts[speaker_id] = self.speaker_counts.get(speaker_id, 0) + 1
+            text_lower = text.lower()
+        
+            entry = Utterance(
+                timestamp=time.time(),
+                speaker_id=speaker_id,
+                speaker_name=speaker_data['name'],
+                text=text,
+                audio_source=audio_source,
+                is_remote=speaker_data['is_remote'],
+                voice_features={
+                    'pitch': voice_features.get('avg_pitch'),
+                    'pace': voice_features.get('words_per_minute'),
+                    'energy': voice_features.get('energy')
+                }
+            )
+        
+            if self.is_question(text, text_lower):
+                entry.type = 'question'
+                entry.question_id = len(self.transcript)
+                self.unanswered_questions.append({
+                    'index': len(self.transcript),
+                    'timestamp': time.time(),
+                    'speaker': speaker_id
+                })
+            else:
+                if self.unanswered_questions:
+                    last_q = self.unanswered_questions[-1]
+                    time_since_q = len(self.transcript) - last_q['index']
                 
-                is_answer = (
-                    time_since_q <= 4 and 
-                    last_q['speaker'] != speaker_id and 
-                    not text.endswith('?')
-                )
+                    is_answer = (
+                        time_since_q <= 4 and 
+                        last_q['speaker'] != speaker_id and 
+                        not text.endswith('?')
+                    )
                 
-                answer_starters = ['yes', 'no', 'absolutely', 'definitely', 'correct', 
-                                 'right', 'exactly', 'sure', 'well', 'i think', 'in my opinion']
-                if any(text.lower().startswith(starter) for starter in answer_starters):
-                    is_answer = True
+                    if _ANSWER_START_RE.match(text_lower):
+                        is_answer = True
                     
-                if is_answer:
-                    entry['type'] = 'answer'
-                    entry['answers_question'] = last_q['index']
+                    if is_answer:
+                        entry.type = 'answer'
+                        entry.answers_question = last_q['index']
                     
-                    if time_since_q >= 2 or text.endswith('.') or len(text) > 100:
-                        self.unanswered_questions.pop()
+                        if time_since_q >= 2 or text.endswith('.') or len(text) > 100:
+                            self.unanswered_questions.pop()
                         
-        if self.detect_decision(text):
-            entry['is_decision'] = True
+            if self.detect_decision(text, text_lower):
+                entry.is_decision = True
             
-        if self.detect_action_item(text, speaker_id):
-            entry['is_action_item'] = True
-            entry['assignee'] = speaker_data['name']
+            if self.detect_action_item(text, speaker_id, text_lower):
+                entry.is_action_item = True
+                entry.assignee = speaker_data['name']
                         
-        self.transcript.append(entry)
-        self.audio_sources.add(audio_source)
-        return entry
+            self.transcript.append(entry)
+        
+            # Bucket the entry the way get_minutes_structure will read it
+            index = len(self.transcript) - 1
+            if entry.answers_question is not None:
+                self.answers_by_q[entry.answers_question].append(index)
+            if entry.type == 'question':
+                self._question_idx.append(index)
+            if entry.is_decision:
+                self._decision_idx.append(index)
+            elif entry.is_action_item:
+                self._action_idx.append(index)
+            elif entry.type == 'statement':
+                self._statement_idx.append(index)
+            
+            self.audio_sources.add(audio_source)
+            return entry
     
     def get_minutes_structure(self):
         """Generate structured minutes"""
@@ -218,7 +420,7 @@ class MeetingStore:
             participant_info = {
                 'name': pdata['name'],
                 'source': pdata['audio_source'],
-                'speaking_time': len([t for t in self.transcript if t['speaker_id'] == pid])
+                'speaking_time': self.speaker_counts.get(pid, 0)
             }
             if pdata['is_remote']:
                 minutes['remote_participants'].append(participant_info)
@@ -226,45 +428,78 @@ class MeetingStore:
                 minutes['participants'].append(participant_info)
         
         used_indices = set()
-        for i, entry in enumerate(self.transcript):
-            if entry['type'] == 'question':
-                qa = {
-                    'question': entry,
-                    'answers': [],
-                    'follow_up_questions': []
-                }
-                used_indices.add(i)
-                
-                j = i + 1
-                while j < len(self.transcript):
-                    next_entry = self.transcript[j]
-                    if next_entry.get('answers_question') == i:
-                        qa['answers'].append(next_entry)
-                        used_indices.add(j)
-                        j += 1
-                    elif next_entry['type'] == 'question' and j < len(self.transcript) - 1:
-                        if next_entry['speaker_id'] == entry['speaker_id']:
-                            qa['follow_up_questions'].append(next_entry)
-                            used_indices.add(j)
-                        break
-                    else:
-                        break
-                        
-                minutes['qa_pairs'].append(qa)
-        
-        for i, entry in enumerate(self.transcript):
-            if i in used_indices:
-                continue
-                
-            if entry.get('is_decision'):
-                minutes['decisions'].append(entry)
-            elif entry.get('is_action_item'):
-                minutes['action_items'].append(entry)
-            elif entry['type'] == 'statement' and len(entry['text']) > 50:
-                minutes['key_discussion_points'].append(entry)
+        for i in self._question_idx:
+            entry = self.transcript[i]
+            # Only the unbroken run of answers right after the question pairs with it
+            answers = []
+            for j in self.answers_by_q.get(i, ()):
+                if j != i + 1 + len(answers):
+                    break
+                answers.append(j)
+            qa = {
+                'question': entry,
+                'answers': [self.transcript[j] for j in answers],
+                'follow_up_questions': []
+            }
+            used_indices.add(i)
+            used_indices.update(answers)
+            
+            # A follow-up is the asker's next question straight after the answers
+            j = i + 1 + len(answers)
+            if j < len(self.transcript) - 1:
+                next_entry = self.transcript[j]
+                if next_entry.type == 'question' and next_entry.speaker_id == entry.speaker_id:
+                    qa['follow_up_questions'].append(next_entry)
+                    used_indices.add(j)
+                    
+            minutes['qa_pairs'].append(qa)
+        
+        # Questions, answers and follow-ups already appear under Q&A
+        minutes['decisions'] = [self.transcript[i] for i in self._decision_idx
+                                if i not in used_indices]
+        minutes['action_items'] = [self.transcript[i] for i in self._action_idx
+                                   if i not in used_indices]
+        minutes['key_discussion_points'] = [self.transcript[i] for i in self._statement_idx
+                                            if len(self.transcript[i].text) > 50]
                 
         return minutes
     
+    def _pdf_key(self):
+        # The PDF only changes when utterances are added or the meeting ends
+        return (len(self.transcript), self.end_time)
+    
+    def _render_pdf(self):
+        """Render under the meeting lock, returning the key the PDF was built for"""
+        with self._lock:
+            return self._pdf_key(), build_minutes_pdf(self)
+    
+    def stop(self):
+        """End the meeting and start rendering the final PDF in the background"""
+        with self._lock:
+            self.end_time = datetime.now().isoformat()
+            self._pdf_prebuild = _pdf_executor.submit(self._render_pdf)
+    
+    def get_pdf(self):
+        """PDF bytes for the current minutes, re-rendered only when they have changed"""
+        with self._lock:
+            key = self._pdf_key()
+            if self._pdf_cache is not None and self._pdf_cache[0] == key:
+                return self._pdf_cache[1]
+            future, self._pdf_prebuild = self._pdf_prebuild, None
+            
+        # The prebuild takes the lock itself, so wait for it outside ours
+        rendered = None
+        if future is not None:
+            try:
+                rendered = future.result()
+            except Exception:
+                pass  # Render again below so the error surfaces on this request
+                
+        if rendered is None or rendered[0] != key:
+            rendered = self._render_pdf()
+        self._pdf_cache = rendered
+        return rendered[1]
+    
     def calculate_duration(self):
         if not self.end_time or not self.start_time:
             return "In progress"
@@ -286,6 +521,24 @@ class MeetingStore:
         except:
             return "Unknown"
 
+def safe_text(text):
+    """Encode text for the PDF core fonts"""
+    if text is None:
+        return ""
+    # ASCII is already latin-1 safe; isascii() is a flag check, no copy
+    if text.isascii():
+        return text
+    # Encode to latin-1, replacing unsupported characters
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+def short_time(timestamp):
+    """HH:MM of an entry timestamp for the PDF"""
+    return datetime.fromtimestamp(timestamp).strftime('%H:%M')
+
+def format_timestamp(timestamp):
+    """ISO string for an entry timestamp; entries store time.time() floats"""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -297,19 +550,29 @@ def start_meeting():
         meeting_type = data.get('meeting_type', 'physical')
         
         meeting_id = str(uuid.uuid4())
-        meetings[meeting_id] = MeetingStore(meeting_type=meeting_type)
-        meetings[meeting_id].start_time = datetime.now().isoformat()
+        meeting = MeetingStore(meeting_type=meeting_type)
+        meeting.start_time = datetime.now().isoformat()
+        meetings[meeting_id] = meeting
+        while len(meetings) > MAX_MEETINGS:
+            meetings.popitem(last=False)
         
         return jsonify({
             'meeting_id': meeting_id,
             'meeting_type': meeting_type,
             'status': 'started',
-            'timestamp': meetings[meeting_id].start_time,
+            'timestamp': meeting.start_time,
             'message': get_setup_message(meeting_type)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def get_meeting(meeting_id):
+    """Look up a meeting with a single dict access, marking it recently used"""
+    meeting = meetings.get(meeting_id)
+    if meeting is not None:
+        meetings.move_to_end(meeting_id)
+    return meeting
+
 def get_setup_message(meeting_type):
     messages = {
         'physical': 'Place your device centrally in the room. All voices will be captured via microphone.',
@@ -321,7 +584,8 @@ def get_setup_message(meeting_type):
 @app.route('/api/meeting/<meeting_id>/audio', methods=['POST'])
 def receive_audio(meeting_id):
     try:
-        if meeting_id not in meetings:
+        meeting = get_meeting(meeting_id)
+        if meeting is None:
             return jsonify({'error': 'Meeting not found'}), 404
             
         data = request.get_json()
@@ -340,13 +604,12 @@ def receive_audio(meeting_id):
         if not text:
             return jsonify({'error': 'No text provided'}), 400
             
-        meeting = meetings[meeting_id]
         voice_features['channel'] = channel
         
         entry = meeting.add_utterance(text, voice_features, audio_source)
         
         return jsonify({
-            'entry': entry,
+            'entry': entry.to_dict(),
             'speaker_count': len(meeting.participants),
             'audio_sources': list(meeting.audio_sources)
         })
@@ -356,16 +619,16 @@ def receive_audio(meeting_id):
 @app.route('/api/meeting/<meeting_id>/status', methods=['GET'])
 def get_status(meeting_id):
     try:
-        if meeting_id not in meetings:
+        meeting = get_meeting(meeting_id)
+        if meeting is None:
             return jsonify({'error': 'Meeting not found'}), 404
             
-        meeting = meetings[meeting_id]
         recent = request.args.get('since', 0, type=int)
         
         new_entries = meeting.transcript[recent:]
         
         return jsonify({
-            'entries': new_entries,
+            'entries': [e.to_dict() for e in new_entries],
             'total_count': len(meeting.transcript),
             'participants': {
                 k: {
@@ -386,174 +649,167 @@ def get_status(meeting_id):
 @app.route('/api/meeting/<meeting_id>/stop', methods=['POST'])
 def stop_meeting(meeting_id):
     try:
-        if meeting_id not in meetings:
+        meeting = get_meeting(meeting_id)
+        if meeting is None:
             return jsonify({'error': 'Meeting not found'}), 404
             
-        meetings[meeting_id].end_time = datetime.now().isoformat()
+        meeting.stop()
         return jsonify({
             'status': 'stopped',
-            'duration': meetings[meeting_id].calculate_duration()
+            'duration': meeting.calculate_duration()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/meeting/<meeting_id>/pdf', methods=['GET'])
-def generate_pdf(meeting_id):
-    try:
-        if meeting_id not in meetings:
-            return jsonify({'error': 'Meeting not found'}), 404
-            
-        meeting = meetings[meeting_id]
-        minutes = meeting.get_minutes_structure()
-        
-        # Create PDF with error handling
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        
-        # Helper function to safely encode text
-        def safe_text(text):
-            if text is None:
-                return ""
-            # Encode to latin-1, replacing unsupported characters
-            return text.encode('latin-1', 'replace').decode('latin-1')
-        
-        # Header
-        pdf.set_font('Arial', 'B', 20)
-        pdf.set_text_color(40, 40, 40)
-        pdf.cell(0, 12, safe_text('MEETING MINUTES'), ln=True, align='C')
-        
+def build_minutes_pdf(meeting):
+    """Render the meeting minutes to PDF bytes"""
+    minutes = meeting.get_minutes_structure()
+    
+    # Create PDF with error handling
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    
+    # Header
+    pdf.set_font('Arial', 'B', 20)
+    pdf.set_text_color(40, 40, 40)
+    pdf.cell(0, 12, safe_text('MEETING MINUTES'), ln=True, align='C')
+    
+    pdf.set_font('Arial', '', 10)
+    pdf.set_text_color(100, 100, 100)
+    date_str = datetime.now().strftime('%B %d, %Y at %H:%M')
+    pdf.cell(0, 6, safe_text(f"{date_str} | {minutes['meeting_type'].upper()} MEETING"), ln=True, align='C')
+    pdf.line(10, 35, 200, 35)
+    pdf.ln(8)
+    
+    # Meeting Info
+    pdf.set_font('Arial', 'B', 12)
+    pdf.set_text_color(40, 40, 40)
+    pdf.cell(0, 8, safe_text('Meeting Information'), ln=True)
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(0, 6, safe_text(f"Duration: {minutes['duration']}"), ln=True)
+    pdf.cell(0, 6, safe_text(f"Audio Sources: {', '.join(minutes['audio_sources'])}"), ln=True)
+    pdf.ln(4)
+    
+    # Participants Section
+    pdf.set_font('Arial', 'B', 12)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(0, 10, safe_text(' PARTICIPANTS'), ln=True, fill=True)
+    
+    if minutes['participants']:
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(0, 6, safe_text('In-Person:'), ln=True)
         pdf.set_font('Arial', '', 10)
-        pdf.set_text_color(100, 100, 100)
-        date_str = datetime.now().strftime('%B %d, %Y at %H:%M')
-        pdf.cell(0, 6, safe_text(f"{date_str} | {minutes['meeting_type'].upper()} MEETING"), ln=True, align='C')
-        pdf.line(10, 35, 200, 35)
-        pdf.ln(8)
-        
-        # Meeting Info
-        pdf.set_font('Arial', 'B', 12)
-        pdf.set_text_color(40, 40, 40)
-        pdf.cell(0, 8, safe_text('Meeting Information'), ln=True)
+        lines = [f"  - {p['name']} ({p['speaking_time']} contributions)"
+                 for p in minutes['participants']]
+        pdf.multi_cell(0, 5, safe_text('\n'.join(lines)), align='L', ln=True)
+    
+    if minutes['remote_participants']:
+        pdf.ln(2)
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(0, 6, safe_text('Remote:'), ln=True)
         pdf.set_font('Arial', '', 10)
-        pdf.cell(0, 6, safe_text(f"Duration: {minutes['duration']}"), ln=True)
-        pdf.cell(0, 6, safe_text(f"Audio Sources: {', '.join(minutes['audio_sources'])}"), ln=True)
-        pdf.ln(4)
-        
-        # Participants Section
+        lines = [f"  - {p['name']} via {p['source'].replace('_', ' ').title()}"
+                 for p in minutes['remote_participants']]
+        pdf.multi_cell(0, 5, safe_text('\n'.join(lines)), align='L', ln=True)
+    
+    pdf.ln(6)
+    
+    # Q&A Section
+    if minutes['qa_pairs']:
         pdf.set_font('Arial', 'B', 12)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.cell(0, 10, safe_text(' PARTICIPANTS'), ln=True, fill=True)
-        
-        if minutes['participants']:
-            pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, safe_text('In-Person:'), ln=True)
-            pdf.set_font('Arial', '', 10)
-            for p in minutes['participants']:
-                line = f"  - {p['name']} ({p['speaking_time']} contributions)"
-                pdf.cell(0, 5, safe_text(line), ln=True)
+        pdf.set_fill_color(230, 240, 255)
+        pdf.cell(0, 10, safe_text(' QUESTIONS & ANSWERS'), ln=True, fill=True)
+        pdf.ln(2)
         
-        if minutes['remote_participants']:
-            pdf.ln(2)
+        for i, qa in enumerate(minutes['qa_pairs'], 1):
+            # Question
             pdf.set_font('Arial', 'B', 10)
-            pdf.cell(0, 6, safe_text('Remote:'), ln=True)
-            pdf.set_font('Arial', '', 10)
-            for p in minutes['remote_participants']:
-                source = p['source'].replace('_', ' ').title()
-                line = f"  - {p['name']} via {source}"
-                pdf.cell(0, 5, safe_text(line), ln=True)
-        
-        pdf.ln(6)
-        
-        # Q&A Section
-        if minutes['qa_pairs']:
-            pdf.set_font('Arial', 'B', 12)
-            pdf.set_fill_color(230, 240, 255)
-            pdf.cell(0, 10, safe_text(' QUESTIONS & ANSWERS'), ln=True, fill=True)
-            pdf.ln(2)
+            pdf.set_text_color(0, 51, 102)
+            q_time = short_time(qa['question'].timestamp)
+            q_text = qa['question'].text
+            q_speaker = qa['question'].speaker_name
             
-            for i, qa in enumerate(minutes['qa_pairs'], 1):
-                # Question
-                pdf.set_font('Arial', 'B', 10)
-                pdf.set_text_color(0, 51, 102)
-                q_time = qa['question']['timestamp'][11:16] if len(qa['question']['timestamp']) > 16 else qa['question']['timestamp']
-                q_text = qa['question']['text']
-                q_speaker = qa['question']['speaker_name']
-                
-                pdf.multi_cell(0, 6, safe_text(f"Q{i}. [{q_time}] {q_speaker}:"))
-                pdf.set_font('Arial', '', 10)
-                pdf.multi_cell(0, 5, safe_text(f"    {q_text}"))
-                
-                # Answers
-                pdf.set_text_color(0, 102, 51)
-                for ans in qa['answers']:
-                    a_time = ans['timestamp'][11:16] if len(ans['timestamp']) > 16 else ans['timestamp']
-                    a_speaker = ans['speaker_name']
-                    a_text = ans['text']
-                    pdf.set_font('Arial', 'B', 9)
-                    pdf.cell(0, 5, safe_text(f"    A. [{a_time}] {a_speaker}:"), ln=True)
-                    pdf.set_font('Arial', '', 9)
-                    pdf.multi_cell(0, 4, safe_text(f"       {a_text}"))
-                
-                pdf.set_text_color(0, 0, 0)
-                pdf.ln(3)
-        
-        # Key Decisions
-        if minutes['decisions']:
-            pdf.ln(4)
-            pdf.set_font('Arial', 'B', 12)
-            pdf.set_fill_color(255, 240, 230)
-            pdf.cell(0, 10, safe_text(' KEY DECISIONS'), ln=True, fill=True)
-            pdf.set_font('Arial', 'B', 10)
-            pdf.set_text_color(180, 80, 40)
+            pdf.multi_cell(0, 6, safe_text(f"Q{i}. [{q_time}] {q_speaker}:"), ln=True)
+            pdf.set_font('Arial', '', 10)
+            pdf.multi_cell(0, 5, safe_text(f"    {q_text}"), ln=True)
             
-            for d in minutes['decisions']:
-                time_str = d['timestamp'][11:16] if len(d['timestamp']) > 16 else d['timestamp']
-                pdf.multi_cell(0, 6, safe_text(f"• [{time_str}] {d['text']}"))
-            pdf.set_text_color(0, 0, 0)
-        
-        # Action Items
-        if minutes['action_items']:
-            pdf.ln(4)
-            pdf.set_font('Arial', 'B', 12)
-            pdf.set_fill_color(255, 255, 230)
-            pdf.cell(0, 10, safe_text(' ACTION ITEMS'), ln=True, fill=True)
-            pdf.set_font('Arial', 'B', 10)
-            pdf.set_text_color(180, 140, 40)
+            # Answers
+            pdf.set_text_color(0, 102, 51)
+            for ans in qa['answers']:
+                a_time = short_time(ans.timestamp)
+                a_speaker = ans.speaker_name
+                a_text = ans.text
+                pdf.set_font('Arial', 'B', 9)
+                pdf.cell(0, 5, safe_text(f"    A. [{a_time}] {a_speaker}:"), ln=True)
+                pdf.set_font('Arial', '', 9)
+                pdf.multi_cell(0, 4, safe_text(f"       {a_text}"), ln=True)
             
-            for item in minutes['action_items']:
-                time_str = item['timestamp'][11:16] if len(item['timestamp']) > 16 else item['timestamp']
-                assignee = item.get('assignee', 'Unassigned')
-                pdf.multi_cell(0, 6, safe_text(f"• [{time_str}] {assignee}: {item['text']}"))
             pdf.set_text_color(0, 0, 0)
-        
-        # Additional Discussion
-        other_entries = [e for e in meeting.transcript 
-                         if e['type'] == 'statement' and len(e['text']) > 30 
-                         and not e.get('is_decision') and not e.get('is_action_item')]
-        
-        if other_entries:
-            pdf.ln(4)
-            pdf.set_font('Arial', 'B', 12)
-            pdf.set_fill_color(245, 245, 245)
-            pdf.cell(0, 10, safe_text(' ADDITIONAL DISCUSSION'), ln=True, fill=True)
-            pdf.set_font('Arial', '', 9)
+            pdf.ln(3)
+    
+    # Key Decisions
+    if minutes['decisions']:
+        pdf.ln(4)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.set_fill_color(255, 240, 230)
+        pdf.cell(0, 10, safe_text(' KEY DECISIONS'), ln=True, fill=True)
+        pdf.set_font('Arial', 'B', 10)
+        pdf.set_text_color(180, 80, 40)
+        
+        lines = [f"• [{short_time(d.timestamp)}] {d.text}" for d in minutes['decisions']]
+        pdf.multi_cell(0, 6, safe_text('\n'.join(lines)), ln=True)
+        pdf.set_text_color(0, 0, 0)
+    
+    # Action Items
+    if minutes['action_items']:
+        pdf.ln(4)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.set_fill_color(255, 255, 230)
+        pdf.cell(0, 10, safe_text(' ACTION ITEMS'), ln=True, fill=True)
+        pdf.set_font('Arial', 'B', 10)
+        pdf.set_text_color(180, 140, 40)
+        
+        lines = [f"• [{short_time(item.timestamp)}] {item.assignee or 'Unassigned'}: {item.text}"
+                 for item in minutes['action_items']]
+        pdf.multi_cell(0, 6, safe_text('\n'.join(lines)), ln=True)
+        pdf.set_text_color(0, 0, 0)
+    
+    # Additional Discussion
+    # _statement_idx already excludes decisions and action items
+    statements = (meeting.transcript[i] for i in meeting._statement_idx)
+    other_entries = list(islice((e for e in statements if len(e.text) > 30), 15))
+    
+    if other_entries:
+        pdf.ln(4)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.set_fill_color(245, 245, 245)
+        pdf.cell(0, 10, safe_text(' ADDITIONAL DISCUSSION'), ln=True, fill=True)
+        pdf.set_font('Arial', '', 9)
+        
+        lines = []
+        for entry in other_entries:  # Limited to 15 to prevent huge PDFs
+            text = entry.text[:80] + '...' if len(entry.text) > 80 else entry.text
+            lines.append(f"[{short_time(entry.timestamp)}] {entry.speaker_name}: {text}")
+        pdf.multi_cell(0, 5, safe_text('\n'.join(lines)), align='L', ln=True)
+    
+    # Footer
+    pdf.set_y(-15)
+    pdf.set_font('Arial', 'I', 8)
+    pdf.set_text_color(128, 128, 128)
+    pdf.cell(0, 10, safe_text(f'Generated by VoiceMinutes AI | Page {pdf.page_no()}'), 0, 0, 'C')
+    
+    # Output to bytes
+    return bytes(pdf.output())
+
+@app.route('/api/meeting/<meeting_id>/pdf', methods=['GET'])
+def generate_pdf(meeting_id):
+    try:
+        meeting = get_meeting(meeting_id)
+        if meeting is None:
+            return jsonify({'error': 'Meeting not found'}), 404
             
-            for entry in other_entries[:15]:  # Limit to prevent huge PDFs
-                time_str = entry['timestamp'][11:16] if len(entry['timestamp']) > 16 else entry['timestamp']
-                text = entry['text'][:80] + '...' if len(entry['text']) > 80 else entry['text']
-                line = f"[{time_str}] {entry['speaker_name']}: {text}"
-                pdf.cell(0, 5, safe_text(line), ln=True)
-        
-        # Footer
-        pdf.set_y(-15)
-        pdf.set_font('Arial', 'I', 8)
-        pdf.set_text_color(128, 128, 128)
-        pdf.cell(0, 10, safe_text(f'Generated by VoiceMinutes AI | Page {pdf.page_no()}'), 0, 0, 'C')
-        
-        # Output to bytes
-        output = io.BytesIO()
-        pdf.output(output)
-        output.seek(0)
+        output = io.BytesIO(meeting.get_pdf())
         
         # Generate safe filename
         safe_meeting_type = meeting.meeting_type.replace('/', '-')